@@ -0,0 +1,62 @@
+"""add trainsnapshot table
+
+Revision ID: 20261019_01_add_train_snapshot
+Revises: 20241024_01_add_wagon_type
+Create Date: 2026-10-19 09:00:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261019_01_add_train_snapshot"
+down_revision = "20241024_01_add_wagon_type"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "trainsnapshot" not in inspector.get_table_names():
+        op.create_table(
+            "trainsnapshot",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column(
+                "train_id",
+                sa.Integer(),
+                sa.ForeignKey("train.id", ondelete="SET NULL"),
+                nullable=True,
+            ),
+            sa.Column("train_name", sa.String(length=200), nullable=False),
+            sa.Column("label", sa.String(length=200), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("wagon_count", sa.Integer(), nullable=False),
+            sa.Column("train_length_m", sa.Float(), nullable=False),
+            sa.Column("train_weight_t", sa.Float(), nullable=False),
+            sa.Column("braking_percentage", sa.Float(), nullable=False),
+            sa.Column(
+                "wagon_fields",
+                sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+                nullable=False,
+            ),
+            sa.Column(
+                "wagons",
+                sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+                nullable=False,
+            ),
+        )
+        op.create_index("ix_trainsnapshot_train_id", "trainsnapshot", ["train_id"])
+        op.create_index("ix_trainsnapshot_train_name", "trainsnapshot", ["train_name"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "trainsnapshot" in inspector.get_table_names():
+        op.drop_index("ix_trainsnapshot_train_name", table_name="trainsnapshot")
+        op.drop_index("ix_trainsnapshot_train_id", table_name="trainsnapshot")
+        op.drop_table("trainsnapshot")
@@ -1,33 +1,98 @@
 from __future__ import annotations
 
-from typing import Annotated
+from typing import Annotated, Any, Iterable, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from pydantic import BaseModel
-from sqlmodel import Session, select
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import func, update
+from sqlalchemy.orm import defer
+from sqlmodel import Session, SQLModel, select
 
 from ..deps import get_session
 from ..models import (
     Train,
     TrainCreate,
+    TrainProjection,
     TrainRead,
+    TrainSnapshot,
+    TrainSnapshotCreate,
+    TrainSnapshotDetail,
+    TrainSnapshotRead,
     TrainUpdate,
     Wagon,
     WagonCreate,
+    WagonProjection,
     WagonRead,
     WagonUpdate,
 )
-from ..services import TrainCalculation, calculate_train
+from ..services import (
+    SNAPSHOT_WAGON_FIELDS,
+    SnapshotDiff,
+    TrainCalculation,
+    calculate_train,
+    diff_snapshots,
+    pack_wagons,
+    unpack_wagons,
+)
 
 router = APIRouter()
 
+PROJECTION_DESCRIPTION = (
+    "All fields when `fields=` is omitted; otherwise only the requested fields are present."
+)
+FieldsQuery = Annotated[
+    Optional[str],
+    Query(
+        description=(
+            "Comma-separated list of fields to return, e.g. `id,length_m`. "
+            "When given, only those fields are present and every field of the "
+            "documented response model is optional."
+        )
+    ),
+]
+
 
 class WagonReorderPayload(BaseModel):
     wagon_ids: list[int]
 
 
-@router.get("/trains", response_model=list[TrainRead])
-def list_trains(session: Annotated[Session, Depends(get_session)]) -> list[Train]:
+class TrainCouplePayload(BaseModel):
+    train_id: int = Field(description="Train whose wagons are appended to the end of this train")
+
+
+class TrainSplitPayload(BaseModel):
+    from_position: int = Field(ge=1, description="First wagon position moved to the new train")
+    name: Optional[str] = Field(default=None, max_length=200)
+    description: Optional[str] = Field(default=None, max_length=1000)
+
+
+class TrainWithCalculation(BaseModel):
+    train: TrainRead
+    calculation: TrainCalculation
+
+
+class ConsistOperationResult(BaseModel):
+    train: TrainWithCalculation
+    other_train: TrainWithCalculation
+
+
+@router.get(
+    "/trains",
+    response_model=list[TrainRead],
+    responses={200: {"model": list[TrainProjection], "description": PROJECTION_DESCRIPTION}},
+)
+def list_trains(
+    session: Annotated[Session, Depends(get_session)], fields: FieldsQuery = None
+) -> list[Train] | Response:
+    selected = _parse_fields(fields, TrainRead)
+    if selected:
+        statement = select(*(getattr(Train, name) for name in selected)).order_by(
+            Train.created_at.desc()
+        )
+        return _projected_response(session.exec(statement), selected)
+
     statement = select(Train).order_by(Train.created_at.desc())
     return list(session.exec(statement))
 
@@ -86,9 +151,21 @@ def delete_train(train_id: int, session: Annotated[Session, Depends(get_session)
 @router.get(
     "/trains/{train_id}/wagons",
     response_model=list[WagonRead],
+    responses={200: {"model": list[WagonProjection], "description": PROJECTION_DESCRIPTION}},
     summary="List wagons for train ordered by position",
 )
-def list_wagons(train_id: int, session: Annotated[Session, Depends(get_session)]) -> list[Wagon]:
+def list_wagons(
+    train_id: int, session: Annotated[Session, Depends(get_session)], fields: FieldsQuery = None
+) -> list[Wagon] | Response:
+    selected = _parse_fields(fields, WagonRead)
+    if selected:
+        statement = (
+            select(*(getattr(Wagon, name) for name in selected))
+            .where(Wagon.train_id == train_id)
+            .order_by(Wagon.position)
+        )
+        return _projected_response(session.exec(statement), selected)
+
     statement = select(Wagon).where(Wagon.train_id == train_id).order_by(Wagon.position)
     return list(session.exec(statement))
 
@@ -258,6 +335,305 @@ def get_train_calculation(
     return calculate_train(train.wagons)
 
 
+@router.post(
+    "/trains/{train_id}/couple",
+    response_model=ConsistOperationResult,
+    summary="Append all wagons of another train to the end of this train",
+    description="The other train is kept as an empty train and returned with zero values.",
+)
+def couple_trains(
+    train_id: int,
+    payload: TrainCouplePayload,
+    session: Annotated[Session, Depends(get_session)],
+) -> ConsistOperationResult:
+    if payload.train_id == train_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot couple a train to itself")
+
+    locked = _lock_trains(session, train_id, payload.train_id)
+    train = locked[train_id]
+    other = locked[payload.train_id]
+    if not train or not other:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Train not found")
+
+    offset = session.exec(
+        select(func.coalesce(func.max(Wagon.position), 0)).where(Wagon.train_id == train_id)
+    ).one()
+    session.exec(
+        update(Wagon)
+        .where(Wagon.train_id == other.id)
+        .values(train_id=train_id, position=Wagon.position + offset)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+
+    return _consist_result(train=train, other_train=other, session=session)
+
+
+@router.post(
+    "/trains/{train_id}/split",
+    response_model=ConsistOperationResult,
+    status_code=status.HTTP_201_CREATED,
+    summary="Move wagons from a position onwards into a new train",
+)
+def split_train(
+    train_id: int,
+    payload: TrainSplitPayload,
+    session: Annotated[Session, Depends(get_session)],
+) -> ConsistOperationResult:
+    train = session.get(Train, train_id, with_for_update=True)
+    if not train:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Train not found")
+
+    min_position = session.exec(
+        select(func.min(Wagon.position)).where(Wagon.train_id == train_id)
+    ).one()
+    first_position = session.exec(
+        select(func.min(Wagon.position)).where(
+            Wagon.train_id == train_id, Wagon.position >= payload.from_position
+        )
+    ).one()
+    if first_position is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No wagons at or after the given position",
+        )
+    if first_position == min_position:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Split would move every wagon; choose a position after the first wagon",
+        )
+
+    new_train = Train(
+        name=payload.name or f"{train.name} (split)",
+        description=payload.description,
+    )
+    session.add(new_train)
+    session.flush()
+
+    session.exec(
+        update(Wagon)
+        .where(Wagon.train_id == train_id, Wagon.position >= first_position)
+        .values(train_id=new_train.id, position=Wagon.position - (first_position - 1))
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+
+    return _consist_result(train=train, other_train=new_train, session=session)
+
+
+@router.post(
+    "/trains/{train_id}/snapshots",
+    response_model=TrainSnapshotRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Freeze the current composition and its calculation",
+)
+def create_snapshot(
+    train_id: int,
+    payload: TrainSnapshotCreate,
+    session: Annotated[Session, Depends(get_session)],
+) -> TrainSnapshot:
+    train = session.get(Train, train_id)
+    if not train:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Train not found")
+
+    wagons = train.wagons
+    calculation = calculate_train(wagons)
+    snapshot = TrainSnapshot(
+        train_id=train_id,
+        train_name=train.name,
+        label=payload.label,
+        wagon_count=len(wagons),
+        wagon_fields=list(SNAPSHOT_WAGON_FIELDS),
+        wagons=pack_wagons(wagons),
+        **calculation,
+    )
+    session.add(snapshot)
+    session.commit()
+    session.refresh(snapshot)
+    return snapshot
+
+
+@router.get(
+    "/trains/{train_id}/snapshots",
+    response_model=list[TrainSnapshotRead],
+    summary="List snapshots for train, newest first",
+)
+def list_snapshots(
+    train_id: int, session: Annotated[Session, Depends(get_session)]
+) -> list[TrainSnapshot]:
+    statement = (
+        select(TrainSnapshot)
+        .where(TrainSnapshot.train_id == train_id)
+        .options(defer(TrainSnapshot.wagons), defer(TrainSnapshot.wagon_fields))
+        .order_by(TrainSnapshot.created_at.desc(), TrainSnapshot.id.desc())
+    )
+    return list(session.exec(statement))
+
+
+@router.get(
+    "/trains/{train_id}/snapshots/{snapshot_id}",
+    response_model=TrainSnapshotDetail,
+)
+def get_snapshot(
+    train_id: int, snapshot_id: int, session: Annotated[Session, Depends(get_session)]
+) -> TrainSnapshotDetail:
+    snapshot = _get_snapshot(train_id=train_id, snapshot_id=snapshot_id, session=session)
+    return _snapshot_detail(snapshot)
+
+
+@router.get(
+    "/trains/{train_id}/snapshots/{snapshot_id}/diff",
+    response_model=SnapshotDiff,
+    summary="Compare a snapshot against another snapshot of the same train",
+)
+def diff_snapshot(
+    train_id: int,
+    snapshot_id: int,
+    against: Annotated[int, Query(description="ID of the snapshot to compare against")],
+    session: Annotated[Session, Depends(get_session)],
+) -> SnapshotDiff:
+    base = _get_snapshot(train_id=train_id, snapshot_id=against, session=session)
+    target = _get_snapshot(train_id=train_id, snapshot_id=snapshot_id, session=session)
+    return _diff(base=base, target=target)
+
+
+@router.get(
+    "/snapshots",
+    response_model=list[TrainSnapshotRead],
+    summary="List snapshots across trains, including snapshots of deleted trains",
+)
+def list_all_snapshots(
+    session: Annotated[Session, Depends(get_session)],
+    train_name: Annotated[
+        Optional[str], Query(description="Only snapshots taken of a train with this name")
+    ] = None,
+    orphaned: Annotated[
+        Optional[bool], Query(description="true: only deleted trains, false: only live trains")
+    ] = None,
+) -> list[TrainSnapshot]:
+    statement = select(TrainSnapshot).options(
+        defer(TrainSnapshot.wagons), defer(TrainSnapshot.wagon_fields)
+    )
+    if train_name is not None:
+        statement = statement.where(TrainSnapshot.train_name == train_name)
+    if orphaned is True:
+        statement = statement.where(TrainSnapshot.train_id.is_(None))
+    elif orphaned is False:
+        statement = statement.where(TrainSnapshot.train_id.is_not(None))
+    statement = statement.order_by(TrainSnapshot.created_at.desc(), TrainSnapshot.id.desc())
+    return list(session.exec(statement))
+
+
+@router.get(
+    "/snapshots/{snapshot_id}",
+    response_model=TrainSnapshotDetail,
+    summary="Get a snapshot by ID, including snapshots of deleted trains",
+)
+def get_snapshot_by_id(
+    snapshot_id: int, session: Annotated[Session, Depends(get_session)]
+) -> TrainSnapshotDetail:
+    return _snapshot_detail(_get_snapshot_by_id(snapshot_id=snapshot_id, session=session))
+
+
+@router.get(
+    "/snapshots/{snapshot_id}/diff",
+    response_model=SnapshotDiff,
+    summary="Compare any two snapshots by ID, including snapshots of deleted trains",
+)
+def diff_snapshot_by_id(
+    snapshot_id: int,
+    against: Annotated[int, Query(description="ID of the snapshot to compare against")],
+    session: Annotated[Session, Depends(get_session)],
+) -> SnapshotDiff:
+    base = _get_snapshot_by_id(snapshot_id=against, session=session)
+    target = _get_snapshot_by_id(snapshot_id=snapshot_id, session=session)
+    return _diff(base=base, target=target)
+
+
+def _diff(base: TrainSnapshot, target: TrainSnapshot) -> SnapshotDiff:
+    return diff_snapshots(
+        base_id=base.id,
+        base_wagons=unpack_wagons(base.wagon_fields, base.wagons),
+        base_calculation=_snapshot_calculation(base),
+        target_id=target.id,
+        target_wagons=unpack_wagons(target.wagon_fields, target.wagons),
+        target_calculation=_snapshot_calculation(target),
+    )
+
+
+def _parse_fields(raw: Optional[str], model: type[SQLModel]) -> list[str]:
+    """Validate a `fields=` projection against the columns exposed by the read model."""
+    if not raw:
+        return []
+    selected = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in model.__fields__]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return selected
+
+
+def _projected_response(rows: Iterable[Any], selected: list[str]) -> JSONResponse:
+    if len(selected) == 1:
+        # A single-column select yields scalars rather than rows.
+        content = [{selected[0]: value} for value in rows]
+    else:
+        content = [dict(zip(selected, row)) for row in rows]
+    return JSONResponse(content=jsonable_encoder(content))
+
+
+def _lock_trains(session: Session, *train_ids: int) -> dict[int, Optional[Train]]:
+    """Lock train rows FOR UPDATE in ascending ID order so concurrent requests cannot deadlock."""
+    return {
+        train_id: session.get(Train, train_id, with_for_update=True)
+        for train_id in sorted(train_ids)
+    }
+
+
+def _consist_result(train: Train, other_train: Train, session: Session) -> ConsistOperationResult:
+    def with_calculation(current: Train) -> TrainWithCalculation:
+        statement = select(Wagon).where(Wagon.train_id == current.id)
+        return TrainWithCalculation(
+            train=TrainRead.model_validate(current),
+            calculation=calculate_train(session.exec(statement)),
+        )
+
+    return ConsistOperationResult(
+        train=with_calculation(train),
+        other_train=with_calculation(other_train),
+    )
+
+
+def _get_snapshot(train_id: int, snapshot_id: int, session: Session) -> TrainSnapshot:
+    snapshot = _get_snapshot_by_id(snapshot_id=snapshot_id, session=session)
+    if snapshot.train_id != train_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    return snapshot
+
+
+def _get_snapshot_by_id(snapshot_id: int, session: Session) -> TrainSnapshot:
+    snapshot = session.get(TrainSnapshot, snapshot_id)
+    if not snapshot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    return snapshot
+
+
+def _snapshot_detail(snapshot: TrainSnapshot) -> TrainSnapshotDetail:
+    return TrainSnapshotDetail.model_validate(
+        snapshot, update={"wagons": unpack_wagons(snapshot.wagon_fields, snapshot.wagons)}
+    )
+
+
+def _snapshot_calculation(snapshot: TrainSnapshot) -> TrainCalculation:
+    return TrainCalculation(
+        train_length_m=snapshot.train_length_m,
+        train_weight_t=snapshot.train_weight_t,
+        braking_percentage=snapshot.braking_percentage,
+    )
+
+
 def _normalize_positions(train_id: int, session: Session) -> None:
     """Ensure sorted positions without gaps after clone/delete operations."""
     statement = select(Wagon).where(Wagon.train_id == train_id).order_by(Wagon.position, Wagon.id)
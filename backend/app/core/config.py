@@ -1,6 +1,6 @@
 import json
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 
 from pydantic import BaseSettings, Field, validator
 
@@ -13,6 +13,12 @@ class Settings(BaseSettings):
         env="DATABASE_URL",
     )
     cors_origins: List[str] | str = Field(default="http://localhost:5173", env="CORS_ORIGINS")
+    response_compression: Literal["none", "gzip", "brotli"] = Field(
+        default="gzip", env="RESPONSE_COMPRESSION"
+    )
+    compression_minimum_size: int = Field(default=1000, ge=0, env="COMPRESSION_MINIMUM_SIZE")
+    enable_sql_profiling: bool = Field(default=False, env="ENABLE_SQL_PROFILING")
+    slow_query_threshold_ms: float = Field(default=200.0, ge=0, env="SLOW_QUERY_THRESHOLD_MS")
 
     @validator("cors_origins", pre=True)
     def split_origins(cls, value: object) -> List[str]:
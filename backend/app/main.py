@@ -1,10 +1,13 @@
+from brotli_asgi import BrotliMiddleware
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from .api.routes import router
 from .core.config import get_settings
 from .core.database import engine, init_db
 from .core.migrations import upgrade_head
+from .profiling import configure_sql_profiling
 from .telemetry import configure_telemetry
 
 settings = get_settings()
@@ -19,6 +22,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.response_compression == "brotli":
+    # Falls back to gzip for clients that do not accept br.
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.compression_minimum_size)
+elif settings.response_compression == "gzip":
+    app.add_middleware(GZipMiddleware, minimum_size=settings.compression_minimum_size)
+
+if settings.enable_sql_profiling:
+    configure_sql_profiling(
+        app=app, engine=engine, slow_query_threshold_ms=settings.slow_query_threshold_ms
+    )
+
 configure_telemetry(app=app, engine=engine)
 
 
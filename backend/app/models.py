@@ -1,7 +1,9 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Optional
 
+from sqlalchemy import JSON, Column, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -43,6 +45,13 @@ class TrainRead(TrainBase):
     id: int
 
 
+class TrainProjection(SQLModel):
+    # List item shape when `fields=` is given; only the requested fields are present.
+    id: Optional[int] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+
+
 class WagonBase(SQLModel):
     position: int = Field(description="Order of the wagon within the train", ge=1)
     identifier: Optional[str] = Field(default=None, max_length=100, description="Optional wagon number")
@@ -88,3 +97,69 @@ class WagonUpdate(SQLModel):
 class WagonRead(WagonBase):
     id: int
     train_id: int
+
+
+class WagonProjection(SQLModel):
+    # List item shape when `fields=` is given; only the requested fields are present.
+    id: Optional[int] = None
+    train_id: Optional[int] = None
+    position: Optional[int] = None
+    identifier: Optional[str] = None
+    length_m: Optional[float] = None
+    tare_weight_t: Optional[float] = None
+    load_weight_t: Optional[float] = None
+    braked_weight_t: Optional[float] = None
+    brake_type: Optional[str] = None
+    axle_count: Optional[int] = None
+    wagon_type: Optional[WagonType] = None
+
+
+class TrainSnapshotBase(SQLModel):
+    label: Optional[str] = Field(default=None, max_length=200, description="e.g. handed to driver")
+
+
+class TrainSnapshot(TrainSnapshotBase, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Snapshots outlive their train; the FK is cleared when the train is deleted.
+    train_id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(Integer, ForeignKey("train.id", ondelete="SET NULL"), index=True, nullable=True),
+    )
+    train_name: str = Field(index=True, max_length=200)
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    wagon_count: int = Field(default=0, ge=0)
+    train_length_m: float = Field(default=0.0)
+    train_weight_t: float = Field(default=0.0)
+    braking_percentage: float = Field(default=0.0)
+    # Column order of the packed rows in `wagons`, stored so old snapshots decode correctly.
+    wagon_fields: List[str] = Field(
+        default_factory=list,
+        sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False),
+    )
+    wagons: List[List[Any]] = Field(
+        default_factory=list,
+        sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False),
+    )
+
+
+class TrainSnapshotCreate(TrainSnapshotBase):
+    pass
+
+
+class TrainSnapshotRead(TrainSnapshotBase):
+    id: int
+    train_id: Optional[int]
+    train_name: str
+    created_at: datetime
+    wagon_count: int
+    train_length_m: float
+    train_weight_t: float
+    braking_percentage: float
+
+
+class SnapshotWagon(WagonBase):
+    id: int
+
+
+class TrainSnapshotDetail(TrainSnapshotRead):
+    wagons: List[SnapshotWagon]
@@ -0,0 +1,95 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, MutableMapping, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    scope: MutableMapping[str, Any]
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "-")
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.2f};desc="statements={self.count}", db-max;dur={self.max_ms:.2f}'
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+class SQLProfilingMiddleware:
+    """Collect per-request statement counts and expose them as a Server-Timing header."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope=scope)
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+
+
+def _record_query(conn, statement: str, slow_query_threshold_ms: float, failed: bool = False) -> None:
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+    if elapsed_ms >= slow_query_threshold_ms:
+        logger.warning(
+            "Slow query (%.1f ms%s) on %s: %s",
+            elapsed_ms,
+            ", failed" if failed else "",
+            stats.route if stats is not None else "-",
+            statement,
+        )
+
+
+def configure_sql_profiling(app, engine, slow_query_threshold_ms: float) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        _record_query(conn, statement, slow_query_threshold_ms)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context) -> None:
+        # Timed-out or failed statements skip after_cursor_execute; record them here instead.
+        conn = exception_context.connection
+        if conn is not None:
+            _record_query(conn, exception_context.statement, slow_query_threshold_ms, failed=True)
+
+    app.add_middleware(SQLProfilingMiddleware)
+    logger.info("SQL profiling enabled (slow query threshold %.0f ms).", slow_query_threshold_ms)
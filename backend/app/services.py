@@ -1,8 +1,21 @@
 from __future__ import annotations
 
-from typing import Iterable, TypedDict
+from typing import Any, Iterable, Sequence, TypedDict
 
-from .models import Wagon
+from .models import Wagon, WagonType
+
+SNAPSHOT_WAGON_FIELDS: tuple[str, ...] = (
+    "id",
+    "position",
+    "identifier",
+    "length_m",
+    "tare_weight_t",
+    "load_weight_t",
+    "braked_weight_t",
+    "brake_type",
+    "axle_count",
+    "wagon_type",
+)
 
 
 class TrainCalculation(TypedDict):
@@ -30,3 +43,78 @@ def calculate_train(wagons: Iterable[Wagon]) -> TrainCalculation:
         train_weight_t=round(weight, 2),
         braking_percentage=round(braking_percentage, 2),
     )
+
+
+class WagonChange(TypedDict):
+    wagon_id: int
+    changes: dict[str, list[Any]]
+
+
+class SnapshotDiff(TypedDict):
+    base_snapshot_id: int
+    target_snapshot_id: int
+    added: list[dict[str, Any]]
+    removed: list[dict[str, Any]]
+    changed: list[WagonChange]
+    calculation_delta: TrainCalculation
+
+
+def pack_wagons(wagons: Iterable[Wagon]) -> list[list[Any]]:
+    """Serialize wagons into compact rows ordered by SNAPSHOT_WAGON_FIELDS."""
+    return [
+        [_pack_value(field, getattr(wagon, field)) for field in SNAPSHOT_WAGON_FIELDS]
+        for wagon in wagons
+    ]
+
+
+def unpack_wagons(fields: Sequence[str], rows: Sequence[Sequence[Any]]) -> list[dict[str, Any]]:
+    """Decode packed rows using the field order stored alongside them."""
+    return [dict(zip(fields, row, strict=True)) for row in rows]
+
+
+def _pack_value(field: str, value: Any) -> Any:
+    if field == "wagon_type":
+        return WagonType(value).value
+    return value
+
+
+def diff_snapshots(
+    base_id: int,
+    base_wagons: Sequence[dict[str, Any]],
+    base_calculation: TrainCalculation,
+    target_id: int,
+    target_wagons: Sequence[dict[str, Any]],
+    target_calculation: TrainCalculation,
+) -> SnapshotDiff:
+    base = {wagon["id"]: wagon for wagon in base_wagons}
+    target = {wagon["id"]: wagon for wagon in target_wagons}
+
+    changed: list[WagonChange] = []
+    for wagon_id, wagon in target.items():
+        previous = base.get(wagon_id)
+        if previous is None:
+            continue
+        # Snapshots taken with different field sets compare missing fields as None.
+        fields = dict.fromkeys([*previous, *wagon])
+        changes = {
+            field: [previous.get(field), wagon.get(field)]
+            for field in fields
+            if previous.get(field) != wagon.get(field)
+        }
+        if changes:
+            changed.append(WagonChange(wagon_id=wagon_id, changes=changes))
+
+    return SnapshotDiff(
+        base_snapshot_id=base_id,
+        target_snapshot_id=target_id,
+        added=[wagon for wagon_id, wagon in target.items() if wagon_id not in base],
+        removed=[wagon for wagon_id, wagon in base.items() if wagon_id not in target],
+        changed=changed,
+        calculation_delta=TrainCalculation(
+            train_length_m=round(target_calculation["train_length_m"] - base_calculation["train_length_m"], 2),
+            train_weight_t=round(target_calculation["train_weight_t"] - base_calculation["train_weight_t"], 2),
+            braking_percentage=round(
+                target_calculation["braking_percentage"] - base_calculation["braking_percentage"], 2
+            ),
+        ),
+    )